@@ -15,6 +15,12 @@ class Settings(BaseSettings):
     night_end_hour: int = 7
     alert_cooldown_minutes: int = 60
     call_delay_minutes: int = 10
+    adaptive_thresholds_enabled: bool = True
+    adaptive_min_samples: int = 14
+    adaptive_gap_sigma: float = 3.0
+    adaptive_decay: float = 0.05
+    adaptive_min_hours: float = 2
+    adaptive_max_hours: float = 12
     fcm_server_key: str | None = None
     twilio_account_sid: str | None = None
     twilio_auth_token: str | None = None
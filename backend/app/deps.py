@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
@@ -6,24 +6,31 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.db import get_db
 from app.models import User
+from app.services.versions import current_etag, etag_matches
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id = int(payload.get("sub"))
+        return int(payload.get("sub"))
     except (JWTError, TypeError, ValueError):
-        raise credentials_exception
+        raise _credentials_exception()
+
+
+def get_current_user(db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> User:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
@@ -34,3 +41,30 @@ def require_role(required_role: str):
         return user
 
     return checker
+
+
+def conditional_get(scope: str, role: str | None = None):
+    """Answer 304 when the client's ETag matches the user's current version.
+
+    Must be declared before the other dependencies so that unchanged polls
+    are served from the token and a single lookup of the user's role and
+    counter. ``role`` mirrors the route's ``require_role``: users without it
+    never get a 304 and fall through to the route's own 403.
+    """
+
+    def checker(
+        response: Response,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(get_current_user_id),
+        if_none_match: str | None = Header(default=None),
+    ) -> str | None:
+        etag = current_etag(db, scope, user_id, role)
+        if etag is None:
+            return None
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return checker
@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.db import Base, engine
-from app.routers import auth, heartbeat, events, safe_zones, caregivers, devices
+from app.routers import auth, heartbeat, events, safe_zones, caregivers, devices, exports
 from app.services.scheduler import start_scheduler
 
 app = FastAPI(title=settings.app_name)
@@ -14,6 +14,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
@@ -34,3 +35,4 @@ app.include_router(events.router)
 app.include_router(safe_zones.router)
 app.include_router(caregivers.router)
 app.include_router(devices.router)
+app.include_router(exports.router)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, UniqueConstraint, JSON
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -45,6 +45,25 @@ class Heartbeat(Base):
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class ActivityProfile(Base):
+    __tablename__ = "activity_profiles"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    timezone = Column(String, nullable=False, default="UTC")
+    last_heartbeat_at = Column(DateTime, nullable=True)
+    hourly_samples = Column(JSON, nullable=False)
+    hourly_gap_mean = Column(JSON, nullable=False)
+    hourly_gap_var = Column(JSON, nullable=False)
+
+
+class UserVersion(Base):
+    __tablename__ = "user_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    scope = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
 class SafeZone(Base):
     __tablename__ = "safe_zones"
 
@@ -1,3 +1,3 @@
-from app.routers import auth, heartbeat, events, safe_zones, caregivers, devices
+from app.routers import auth, heartbeat, events, safe_zones, caregivers, devices, exports
 
-__all__ = ["auth", "heartbeat", "events", "safe_zones", "caregivers", "devices"]
+__all__ = ["auth", "heartbeat", "events", "safe_zones", "caregivers", "devices", "exports"]
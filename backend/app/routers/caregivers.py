@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.deps import get_current_user, require_role
+from app.deps import conditional_get, get_current_user, require_role
 from app.models import CaregiverLink, User, CaregiverContact
 from app.schemas import CaregiverLinkIn, CaregiverContactIn
+from app.services.versions import CONTACT, EVENTS, LINKED, bump
 
 router = APIRouter(prefix="/caregivers", tags=["caregivers"])
 
@@ -22,12 +23,16 @@ def link_caregiver(payload: CaregiverLinkIn, db: Session = Depends(get_db), user
     if existing:
         return {"status": "already_linked"}
     db.add(CaregiverLink(user_id=user.id, caregiver_id=caregiver.id))
+    bump(db, LINKED, user.id, caregiver.id)
+    bump(db, EVENTS, caregiver.id)
     db.commit()
     return {"status": "linked"}
 
 
 @router.get("/linked")
-def list_linked(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def list_linked(
+    _etag=Depends(conditional_get(LINKED)), db: Session = Depends(get_db), user=Depends(get_current_user)
+):
     if user.role == "USER":
         caregivers = (
             db.query(User)
@@ -53,12 +58,17 @@ def set_contact(payload: CaregiverContactIn, db: Session = Depends(get_db), user
     else:
         contact = CaregiverContact(caregiver_id=user.id, phone_number=payload.phone_number)
         db.add(contact)
+    bump(db, CONTACT, user.id)
     db.commit()
     return {"status": "saved"}
 
 
 @router.get("/contact")
-def get_contact(db: Session = Depends(get_db), user=Depends(require_role("CAREGIVER"))):
+def get_contact(
+    _etag=Depends(conditional_get(CONTACT, role="CAREGIVER")),
+    db: Session = Depends(get_db),
+    user=Depends(require_role("CAREGIVER")),
+):
     contact = db.query(CaregiverContact).filter(CaregiverContact.caregiver_id == user.id).first()
     if not contact:
         return {"phone_number": None}
@@ -2,16 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.deps import get_current_user
+from app.deps import conditional_get, get_current_user
 from app.models import Event, CaregiverLink
 from app.services.scheduler import _create_event, _notify_caregivers
+from app.services.versions import EVENTS, bump_events
 from app.schemas import EventOut, EventAction, EventCreate
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
 @router.get("", response_model=list[EventOut])
-def list_events(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def list_events(
+    _etag=Depends(conditional_get(EVENTS)), db: Session = Depends(get_db), user=Depends(get_current_user)
+):
     if user.role == "USER":
         return db.query(Event).filter(Event.user_id == user.id).order_by(Event.created_at.desc()).all()
     caregiver_links = db.query(CaregiverLink).filter(CaregiverLink.caregiver_id == user.id).all()
@@ -46,6 +49,7 @@ def action_event(
     if payload.action not in {"CONFIRM", "CANCEL"}:
         raise HTTPException(status_code=400, detail="Invalid action")
     event.status = "CONFIRMED" if payload.action == "CONFIRM" else "CANCELLED"
+    bump_events(db, event.user_id)
     db.commit()
     db.refresh(event)
     return event
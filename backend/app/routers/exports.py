@@ -0,0 +1,108 @@
+import csv
+import io
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal, get_db
+from app.deps import get_current_user
+from app.models import CaregiverLink, Event, Heartbeat
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_CHUNK_SIZE = 5000
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _check_access(db: Session, user, user_id: int) -> None:
+    if user.role == "USER" and user.id == user_id:
+        return
+    if user.role == "CAREGIVER":
+        link = (
+            db.query(CaregiverLink)
+            .filter(CaregiverLink.user_id == user_id, CaregiverLink.caregiver_id == user.id)
+            .first()
+        )
+        if link:
+            return
+    raise HTTPException(status_code=403, detail="Not allowed")
+
+
+def _stream_rows(columns, filters, order_by, fmt: str):
+    """Yield the export chunk by chunk from a server-side cursor.
+
+    Runs on its own session: the request's session is closed before the
+    response body is streamed.
+    """
+    names = [column.key for column in columns]
+    db = SessionLocal()
+    try:
+        rows = db.query(*columns).filter(*filters).order_by(*order_by).yield_per(EXPORT_CHUNK_SIZE)
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            for count, row in enumerate(rows, start=1):
+                writer.writerow(value.isoformat() if hasattr(value, "isoformat") else value for value in row)
+                if count % EXPORT_CHUNK_SIZE == 0:
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue().encode()
+            return
+        chunk: list[bytes] = []
+        for row in rows:
+            chunk.append(orjson.dumps(dict(zip(names, row))))
+            if len(chunk) == EXPORT_CHUNK_SIZE:
+                chunk.append(b"")
+                yield b"\n".join(chunk)
+                chunk = []
+        if chunk:
+            chunk.append(b"")
+            yield b"\n".join(chunk)
+    finally:
+        db.close()
+
+
+def _export_response(user_id: int, kind: str, fmt: str, rows) -> StreamingResponse:
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="user-{user_id}-{kind}.{fmt}"'},
+    )
+
+
+@router.get("/{user_id}/events")
+def export_events(
+    user_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    _check_access(db, user, user_id)
+    rows = _stream_rows(
+        [Event.id, Event.user_id, Event.type, Event.status, Event.created_at],
+        [Event.user_id == user_id],
+        [Event.created_at, Event.id],
+        format,
+    )
+    return _export_response(user_id, "events", format, rows)
+
+
+@router.get("/{user_id}/heartbeats")
+def export_heartbeats(
+    user_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    _check_access(db, user, user_id)
+    rows = _stream_rows(
+        [Heartbeat.id, Heartbeat.user_id, Heartbeat.timestamp],
+        [Heartbeat.user_id == user_id],
+        [Heartbeat.timestamp, Heartbeat.id],
+        format,
+    )
+    return _export_response(user_id, "heartbeats", format, rows)
@@ -1,12 +1,14 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.deps import require_role
 from app.models import Heartbeat, Event
 from app.schemas import HeartbeatIn, HeartbeatOut
+from app.services.activity import as_utc, is_valid_timezone, record_heartbeat
+from app.services.versions import bump_events
 
 router = APIRouter(prefix="/heartbeat", tags=["heartbeat"])
 
@@ -17,12 +19,17 @@ def create_heartbeat(
     db: Session = Depends(get_db),
     user=Depends(require_role("USER")),
 ):
-    timestamp = payload.timestamp or datetime.utcnow()
+    if payload.timezone and not is_valid_timezone(payload.timezone):
+        raise HTTPException(status_code=400, detail="Invalid timezone")
+    timestamp = as_utc(payload.timestamp) if payload.timestamp else datetime.utcnow()
     heartbeat = Heartbeat(user_id=user.id, timestamp=timestamp)
     db.add(heartbeat)
-    db.query(Event).filter(Event.user_id == user.id, Event.status == "OPEN").update(
+    record_heartbeat(db, user.id, timestamp, payload.timezone)
+    cancelled = db.query(Event).filter(Event.user_id == user.id, Event.status == "OPEN").update(
         {"status": "CANCELLED"}
     )
+    if cancelled:
+        bump_events(db, user.id)
     db.commit()
     db.refresh(heartbeat)
     return heartbeat
@@ -2,15 +2,20 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.deps import require_role
+from app.deps import conditional_get, require_role
 from app.models import SafeZone
 from app.schemas import SafeZoneIn, SafeZoneOut
+from app.services.versions import SAFE_ZONES, bump
 
 router = APIRouter(prefix="/safe-zones", tags=["safe_zones"])
 
 
 @router.get("", response_model=list[SafeZoneOut])
-def list_safe_zones(db: Session = Depends(get_db), user=Depends(require_role("USER"))):
+def list_safe_zones(
+    _etag=Depends(conditional_get(SAFE_ZONES, role="USER")),
+    db: Session = Depends(get_db),
+    user=Depends(require_role("USER")),
+):
     return db.query(SafeZone).filter(SafeZone.user_id == user.id).all()
 
 
@@ -29,6 +34,7 @@ def upsert_safe_zone(payload: SafeZoneIn, db: Session = Depends(get_db), user=De
             radius_meters=payload.radius_meters,
         )
         db.add(zone)
+    bump(db, SAFE_ZONES, user.id)
     db.commit()
     db.refresh(zone)
     return zone
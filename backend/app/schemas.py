@@ -19,6 +19,11 @@ class RegisterIn(UserCreate):
     risk_level: str | None = None
 
 
+class BulkUserIn(RegisterIn):
+    phone_number: str | None = None
+    caregivers: list[EmailStr] = []
+
+
 class UserOut(BaseModel):
     id: int
     email: EmailStr
@@ -47,6 +52,7 @@ class ProfileOut(BaseModel):
 
 class HeartbeatIn(BaseModel):
     timestamp: datetime | None = None
+    timezone: str | None = None
 
 
 class HeartbeatOut(BaseModel):
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import upsert_insert
+from app.models import ActivityProfile
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_DAY = 24
+
+
+def is_valid_timezone(name: str) -> bool:
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def as_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, as stored in the database."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_hour(value: datetime, tz_name: str | None) -> int:
+    if not tz_name or tz_name == "UTC":
+        return value.hour
+    return value.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(tz_name)).hour
+
+
+def record_heartbeat(db: Session, user_id: int, timestamp: datetime, tz_name: str | None = None) -> None:
+    """Fold one heartbeat into the user's hourly gap statistics.
+
+    The gap since the previous heartbeat is attributed to the local hour in
+    which it started and merged into an exponentially weighted mean and
+    variance for that hour, so each heartbeat costs a single row update.
+    Heartbeats older than the latest one only refresh the timezone. The
+    update runs in a savepoint and never raises: a failure is logged and the
+    caller's heartbeat is still committed. The caller commits.
+    """
+    try:
+        with db.begin_nested():
+            _update_profile(db, user_id, as_utc(timestamp), tz_name)
+    except SQLAlchemyError:
+        logger.exception("Activity profile update failed for user %s", user_id)
+
+
+def _update_profile(db: Session, user_id: int, timestamp: datetime, tz_name: str | None) -> None:
+    # Concurrent first heartbeats (web and mobile) must not collide on the
+    # primary key, and later ones must not overwrite each other's update.
+    db.execute(
+        upsert_insert(db, ActivityProfile)
+        .values(
+            user_id=user_id,
+            timezone=tz_name or "UTC",
+            hourly_samples=[0] * HOURS_PER_DAY,
+            hourly_gap_mean=[0.0] * HOURS_PER_DAY,
+            hourly_gap_var=[0.0] * HOURS_PER_DAY,
+        )
+        .on_conflict_do_nothing(index_elements=[ActivityProfile.user_id])
+    )
+    activity = (
+        db.query(ActivityProfile)
+        .filter(ActivityProfile.user_id == user_id)
+        .with_for_update()
+        .populate_existing()
+        .one()
+    )
+    if tz_name:
+        activity.timezone = tz_name
+
+    last = activity.last_heartbeat_at
+    if last is not None and timestamp <= last:
+        return
+    if last is not None:
+        hour = local_hour(last, activity.timezone)
+        gap = (timestamp - last).total_seconds() / 60
+        samples = list(activity.hourly_samples)
+        means = list(activity.hourly_gap_mean)
+        variances = list(activity.hourly_gap_var)
+        samples[hour] += 1
+        alpha = max(settings.adaptive_decay, 1 / samples[hour])
+        diff = gap - means[hour]
+        increment = alpha * diff
+        means[hour] += increment
+        variances[hour] = (1 - alpha) * (variances[hour] + diff * increment)
+        activity.hourly_samples = samples
+        activity.hourly_gap_mean = means
+        activity.hourly_gap_var = variances
+    activity.last_heartbeat_at = timestamp
+
+
+def expected_gap_threshold(activity: ActivityProfile | None, last_heartbeat: datetime | None) -> timedelta | None:
+    """Per-user threshold for the gap that started at ``last_heartbeat``.
+
+    Returns None until the hour has enough samples, so the caller falls back
+    to the global thresholds.
+    """
+    if not settings.adaptive_thresholds_enabled or activity is None or last_heartbeat is None:
+        return None
+    hour = local_hour(as_utc(last_heartbeat), activity.timezone)
+    if activity.hourly_samples[hour] < settings.adaptive_min_samples:
+        return None
+    minutes = activity.hourly_gap_mean[hour] + settings.adaptive_gap_sigma * math.sqrt(activity.hourly_gap_var[hour])
+    minutes = min(max(minutes, settings.adaptive_min_hours * 60), settings.adaptive_max_hours * 60)
+    return timedelta(minutes=minutes)
@@ -0,0 +1,388 @@
+"""Offline replay of the inactivity scheduler over recorded heartbeats.
+
+The scheduler evaluates every USER on a fixed tick (``check_inactivity``) and
+raises an INACTIVITY event when the time since the last heartbeat exceeds
+``_inactivity_threshold``, unless an event was created within the alert
+cooldown. This module reproduces that logic with NumPy over whole heartbeat
+histories so threshold settings can be compared before they are deployed:
+
+    python -m app.services.backtest --standard-hours 6 8 10 --night-hours 10 12
+
+Only ticks that fall inside a heartbeat gap longer than the smallest threshold
+of the grid are materialised, so the work is proportional to the time users
+spent inactive rather than to users x ticks. The night window is evaluated in
+each user's local time, as recorded in their activity profile.
+
+Only the global thresholds are replayed: adaptive per-user thresholds
+(``adaptive_thresholds_enabled``) are ignored, so with them enabled the
+results describe the fallback the scheduler uses for hours without enough
+samples. Events other than INACTIVITY (SOS, FALL, GEOFENCE_EXIT) are not
+replayed and therefore do not contribute to the cooldown.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models import ActivityProfile, CaregiverContact, CaregiverLink, DeviceToken, Heartbeat, Profile, User
+from app.services.scheduler import CALL_FALLBACK_CHECK_MINUTES, INACTIVITY_CHECK_MINUTES
+
+LOAD_CHUNK_SIZE = 50_000
+_NO_PICK = np.int64(-(2**62))
+
+
+@dataclass
+class HeartbeatHistory:
+    """Columnar heartbeat history, sorted by (user, timestamp).
+
+    Timestamps are naive UTC datetimes stored as integer epoch seconds.
+    ``hb_user`` indexes into the per-user arrays and ``user_tz`` into
+    ``timezones``.
+    """
+
+    user_ids: np.ndarray
+    high_risk: np.ndarray
+    push_fanout: np.ndarray
+    call_fanout: np.ndarray
+    hb_user: np.ndarray
+    hb_ts: np.ndarray
+    end_ts: int
+    user_tz: np.ndarray | None = None
+    timezones: list[str] = field(default_factory=lambda: ["UTC"])
+
+    def __post_init__(self) -> None:
+        if self.user_tz is None:
+            self.user_tz = np.zeros(len(self.user_ids), dtype=np.int64)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, end_ts=np.int64(self.end_ts), timezones=np.array(self.timezones), **{
+            name: getattr(self, name)
+            for name in ("user_ids", "high_risk", "push_fanout", "call_fanout", "hb_user", "hb_ts", "user_tz")
+        })
+
+
+@dataclass(frozen=True)
+class ThresholdConfig:
+    standard_hours: float = settings.inactivity_standard_hours
+    night_hours: float = settings.inactivity_night_hours
+    high_risk_hours: float = settings.inactivity_high_risk_hours
+    night_start_hour: int = settings.night_start_hour
+    night_end_hour: int = settings.night_end_hour
+    cooldown_minutes: int = settings.alert_cooldown_minutes
+
+    @property
+    def min_threshold_hours(self) -> float:
+        return min(self.standard_hours, self.night_hours, self.high_risk_hours)
+
+
+@dataclass
+class _Candidates:
+    gap_start: np.ndarray
+    gap_end: np.ndarray
+    has_next: np.ndarray
+    gap_idx: np.ndarray
+    ticks: np.ndarray
+    local_hour: np.ndarray
+
+
+def _to_epoch_seconds(timestamps: list[datetime]) -> np.ndarray:
+    return np.array(timestamps, dtype="datetime64[s]").astype(np.int64)
+
+
+def _fanout(db: Session, column, join_model, join_on, user_ids: np.ndarray) -> np.ndarray:
+    rows = (
+        db.query(CaregiverLink.user_id, func.count(func.distinct(column)))
+        .join(join_model, join_on)
+        .group_by(CaregiverLink.user_id)
+        .all()
+    )
+    fanout = np.zeros(len(user_ids), dtype=np.int64)
+    for user_id, count in rows:
+        idx = np.searchsorted(user_ids, user_id)
+        if idx < len(user_ids) and user_ids[idx] == user_id:
+            fanout[idx] = count
+    return fanout
+
+
+def load_history_from_db(db: Session, since: datetime | None = None, until: datetime | None = None) -> HeartbeatHistory:
+    until = until or datetime.utcnow()
+    users = (
+        db.query(User.id, Profile.risk_level, ActivityProfile.timezone)
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .outerjoin(ActivityProfile, ActivityProfile.user_id == User.id)
+        .filter(User.role == "USER")
+        .order_by(User.id)
+        .all()
+    )
+    user_ids = np.array([row[0] for row in users], dtype=np.int64)
+    high_risk = np.array([row[1] == "high" for row in users], dtype=bool)
+    timezones = sorted({row[2] or "UTC" for row in users} | {"UTC"})
+    user_tz = np.array([timezones.index(row[2] or "UTC") for row in users], dtype=np.int64)
+    push_fanout = _fanout(
+        db, DeviceToken.token, DeviceToken, DeviceToken.user_id == CaregiverLink.caregiver_id, user_ids
+    )
+    call_fanout = _fanout(
+        db,
+        CaregiverContact.phone_number,
+        CaregiverContact,
+        CaregiverContact.caregiver_id == CaregiverLink.caregiver_id,
+        user_ids,
+    )
+
+    query = (
+        db.query(Heartbeat.user_id, Heartbeat.timestamp)
+        .join(User, User.id == Heartbeat.user_id)
+        .filter(User.role == "USER", Heartbeat.timestamp <= until)
+    )
+    if since is not None:
+        query = query.filter(Heartbeat.timestamp >= since)
+    rows = iter(query.order_by(Heartbeat.user_id, Heartbeat.timestamp).yield_per(LOAD_CHUNK_SIZE))
+    user_chunks: list[np.ndarray] = []
+    ts_chunks: list[np.ndarray] = []
+    while True:
+        chunk = list(itertools.islice(rows, LOAD_CHUNK_SIZE))
+        if not chunk:
+            break
+        user_chunks.append(np.fromiter((row[0] for row in chunk), dtype=np.int64, count=len(chunk)))
+        ts_chunks.append(_to_epoch_seconds([row[1] for row in chunk]))
+    hb_user_ids = np.concatenate(user_chunks) if user_chunks else np.empty(0, dtype=np.int64)
+    hb_ts = np.concatenate(ts_chunks) if ts_chunks else np.empty(0, dtype=np.int64)
+
+    return HeartbeatHistory(
+        user_ids=user_ids,
+        high_risk=high_risk,
+        push_fanout=push_fanout,
+        call_fanout=call_fanout,
+        hb_user=np.searchsorted(user_ids, hb_user_ids),
+        hb_ts=hb_ts,
+        end_ts=int(_to_epoch_seconds([until])[0]),
+        user_tz=user_tz,
+        timezones=timezones,
+    )
+
+
+def load_history_from_file(path: str) -> HeartbeatHistory:
+    with np.load(path) as data:
+        return HeartbeatHistory(
+            user_ids=data["user_ids"],
+            high_risk=data["high_risk"].astype(bool),
+            push_fanout=data["push_fanout"],
+            call_fanout=data["call_fanout"],
+            hb_user=data["hb_user"],
+            hb_ts=data["hb_ts"].astype(np.int64),
+            end_ts=int(data["end_ts"]),
+            user_tz=data["user_tz"] if "user_tz" in data else None,
+            timezones=[str(name) for name in data["timezones"]] if "timezones" in data else ["UTC"],
+        )
+
+
+def _local_hours(ts: np.ndarray, tz_index: np.ndarray, timezones: list[str]) -> np.ndarray:
+    """Local hour of each UTC epoch second in the timezone ``timezones[tz_index]``.
+
+    UTC offsets are looked up once per timezone and UTC hour of the covered
+    span, then gathered for every timestamp.
+    """
+    utc_hours = ts // 3600
+    if not len(ts) or all(name == "UTC" for name in timezones):
+        return utc_hours % 24
+    first = int(utc_hours.min())
+    span = int(utc_hours.max()) - first + 1
+    offsets = np.zeros((len(timezones), span), dtype=np.int64)
+    for index, name in enumerate(timezones):
+        if name == "UTC":
+            continue
+        zone = ZoneInfo(name)
+        for hour in range(span):
+            moment = datetime.fromtimestamp((first + hour) * 3600, timezone.utc).astimezone(zone)
+            offsets[index, hour] = int(moment.utcoffset().total_seconds())
+    return ((ts + offsets[tz_index, utc_hours - first]) // 3600) % 24
+
+
+def _candidate_ticks(history: HeartbeatHistory, min_threshold_seconds: int, tick: int) -> _Candidates:
+    """Enumerate the scheduler ticks at which some threshold could fire.
+
+    A gap starts at a heartbeat and ends at the next heartbeat of the same
+    user (or at ``end_ts``). A tick belongs to the gap when the gap's
+    heartbeat is the latest one at or before the tick.
+    """
+    gap_start = history.hb_ts
+    has_next = np.zeros(len(gap_start), dtype=bool)
+    has_next[:-1] = history.hb_user[1:] == history.hb_user[:-1]
+    gap_end = np.full(len(gap_start), history.end_ts, dtype=np.int64)
+    gap_end[:-1] = np.where(has_next[:-1], gap_start[1:], history.end_ts)
+
+    first_tick = (gap_start + min_threshold_seconds) // tick + 1
+    last_tick = -(-gap_end // tick) - 1
+    counts = np.clip(last_tick - first_tick + 1, 0, None)
+    gap_idx = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    ticks = first_tick[gap_idx] + offsets
+    local_hour = _local_hours(ticks * tick, history.user_tz[history.hb_user[gap_idx]], history.timezones)
+    return _Candidates(gap_start, gap_end, has_next, gap_idx, ticks, local_hour)
+
+
+def _cooldown_picks(seg_user: np.ndarray, seg_first: np.ndarray, seg_last: np.ndarray, spacing: int):
+    """Apply the alert cooldown to runs of consecutive eligible ticks.
+
+    Within a run events fire every ``spacing`` ticks. A run may still be in
+    cooldown from the previous run of the same user, so the first pick of each
+    run is propagated along the user's runs until it stops changing; this only
+    takes as many passes as the longest chain of runs closer than the cooldown.
+    """
+    same_prev = np.zeros(len(seg_user), dtype=bool)
+    same_prev[1:] = seg_user[1:] == seg_user[:-1]
+    last_pick = np.full(len(seg_user), _NO_PICK, dtype=np.int64)
+    while True:
+        carried = np.full(len(seg_user), _NO_PICK, dtype=np.int64)
+        carried[1:] = np.where(same_prev[1:], last_pick[:-1], _NO_PICK)
+        first = np.maximum(seg_first, carried + spacing)
+        fires = first <= seg_last
+        new_last = np.where(fires, first + (seg_last - first) // spacing * spacing, carried)
+        if np.array_equal(new_last, last_pick):
+            return first, np.where(fires, (seg_last - first) // spacing + 1, 0)
+        last_pick = new_last
+
+
+def replay(
+    history: HeartbeatHistory,
+    config: ThresholdConfig,
+    tick_minutes: int = INACTIVITY_CHECK_MINUTES,
+    call_delay_minutes: int = settings.call_delay_minutes,
+    false_alarm_minutes: int = 30,
+    candidates: _Candidates | None = None,
+) -> dict:
+    """Replay ``check_inactivity`` and ``check_call_fallbacks`` for one config.
+
+    An alert counts as a false alarm when the user checked in within
+    ``false_alarm_minutes`` of it. Every alert notifies the linked caregivers
+    once, and again from the call fallback when it is still OPEN after
+    ``call_delay_minutes``.
+    """
+    tick = tick_minutes * 60
+    if candidates is None:
+        candidates = _candidate_ticks(history, int(config.min_threshold_hours * 3600), tick)
+    summary = {"alerts": 0, "users_alerted": 0, "false_alarms": 0, "fallbacks": 0, "pushes": 0, "calls": 0}
+
+    tick_ts = candidates.ticks * tick
+    hour = candidates.local_hour
+    in_night = (hour >= config.night_start_hour) | (hour < config.night_end_hour)
+    gap_user = history.hb_user[candidates.gap_idx]
+    threshold = np.where(
+        history.high_risk[gap_user],
+        int(config.high_risk_hours * 3600),
+        np.where(in_night, int(config.night_hours * 3600), int(config.standard_hours * 3600)),
+    )
+    eligible = tick_ts - candidates.gap_start[candidates.gap_idx] > threshold
+    ticks = candidates.ticks[eligible]
+    gaps = candidates.gap_idx[eligible]
+    if not len(ticks):
+        return summary
+
+    run_break = np.ones(len(ticks), dtype=bool)
+    run_break[1:] = (gaps[1:] != gaps[:-1]) | (ticks[1:] != ticks[:-1] + 1)
+    run_start = np.flatnonzero(run_break)
+    run_end = np.append(run_start[1:] - 1, len(ticks) - 1)
+    run_gap = gaps[run_start]
+    spacing = config.cooldown_minutes * 60 // tick + 1
+    first, counts = _cooldown_picks(history.hb_user[run_gap], ticks[run_start], ticks[run_end], spacing)
+
+    event_run = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    event_ts = (first[event_run] + offsets * spacing) * tick
+    event_gap = run_gap[event_run]
+    event_user = history.hb_user[event_gap]
+    next_ts = candidates.gap_end[event_gap]
+
+    fallback_step = CALL_FALLBACK_CHECK_MINUTES * 60
+    fallback_ts = -(-(event_ts + call_delay_minutes * 60) // fallback_step) * fallback_step
+    fallback = next_ts > fallback_ts
+    rounds = 1 + fallback.astype(np.int64)
+
+    summary["alerts"] = int(len(event_ts))
+    summary["users_alerted"] = int(len(np.unique(event_user)))
+    summary["false_alarms"] = int(
+        np.count_nonzero(candidates.has_next[event_gap] & (next_ts - event_ts <= false_alarm_minutes * 60))
+    )
+    summary["fallbacks"] = int(np.count_nonzero(fallback))
+    summary["pushes"] = int((history.push_fanout[event_user] * rounds).sum())
+    summary["calls"] = int((history.call_fanout[event_user] * rounds).sum())
+    return summary
+
+
+def sweep(history: HeartbeatHistory, configs: list[ThresholdConfig], **kwargs) -> list[dict]:
+    """Replay every config, sharing the candidate ticks across the grid."""
+    if not configs:
+        return []
+    tick = kwargs.get("tick_minutes", INACTIVITY_CHECK_MINUTES) * 60
+    min_threshold = min(config.min_threshold_hours for config in configs)
+    candidates = _candidate_ticks(history, int(min_threshold * 3600), tick)
+    return [{**asdict(config), **replay(history, config, candidates=candidates, **kwargs)} for config in configs]
+
+
+def build_grid(**values: list) -> list[ThresholdConfig]:
+    keys = list(values)
+    return [ThresholdConfig(**dict(zip(keys, combo))) for combo in itertools.product(*values.values())]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest inactivity thresholds on recorded heartbeats")
+    parser.add_argument("--file", help="Load history from an .npz export instead of the database")
+    parser.add_argument("--export", help="Write the loaded history to an .npz file and exit")
+    parser.add_argument("--days", type=int, help="Only load the last N days from the database")
+    parser.add_argument("--standard-hours", type=float, nargs="+", default=[settings.inactivity_standard_hours])
+    parser.add_argument("--night-hours", type=float, nargs="+", default=[settings.inactivity_night_hours])
+    parser.add_argument("--high-risk-hours", type=float, nargs="+", default=[settings.inactivity_high_risk_hours])
+    parser.add_argument("--night-start-hour", type=int, nargs="+", default=[settings.night_start_hour])
+    parser.add_argument("--night-end-hour", type=int, nargs="+", default=[settings.night_end_hour])
+    parser.add_argument("--cooldown-minutes", type=int, nargs="+", default=[settings.alert_cooldown_minutes])
+    parser.add_argument("--false-alarm-minutes", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    if args.file:
+        history = load_history_from_file(args.file)
+    else:
+        db = SessionLocal()
+        try:
+            since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+            history = load_history_from_db(db, since=since)
+        finally:
+            db.close()
+    if args.export:
+        history.save(args.export)
+        print(f"Exported {len(history.hb_ts)} heartbeats for {len(history.user_ids)} users to {args.export}")
+        return
+
+    configs = build_grid(
+        standard_hours=args.standard_hours,
+        night_hours=args.night_hours,
+        high_risk_hours=args.high_risk_hours,
+        night_start_hour=args.night_start_hour,
+        night_end_hour=args.night_end_hour,
+        cooldown_minutes=args.cooldown_minutes,
+    )
+    if settings.adaptive_thresholds_enabled:
+        print(
+            "Warning: adaptive per-user thresholds are enabled but not replayed; "
+            "results model the global thresholds only.",
+            file=sys.stderr,
+        )
+    results = sweep(history, configs, false_alarm_minutes=args.false_alarm_minutes)
+    columns = list(results[0])
+    print("\t".join(columns))
+    for row in results:
+        print("\t".join(str(row[column]) for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Bulk onboarding of users, profiles, caregiver links and caregiver contacts.
+
+Each input row describes one account, in CSV or NDJSON:
+
+    email,password,role,name,age,risk_level,phone_number,caregivers
+    anna@example.com,secret,USER,Anna,82,high,,mario@example.com;lucia@example.com
+    mario@example.com,secret,CAREGIVER,,,,+390612345678,
+
+``caregivers`` (``;``-separated in CSV, a list in NDJSON) links a USER to
+caregivers created in the same file or already registered. ``phone_number``
+sets the contact of a CAREGIVER. Every row is validated before anything is
+written; invalid rows are reported and skipped, the rest are imported:
+
+    python -m app.services.bulk_import residents.csv --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.auth import hash_password
+from app.db import SessionLocal
+from app.models import CaregiverContact, CaregiverLink, Profile, User
+from app.schemas import BulkUserIn
+from app.services.versions import EVENTS, LINKED, bump
+
+BATCH_SIZE = 500
+
+
+def read_rows(path: str) -> list[tuple[int, dict]]:
+    """Return ``(line_number, raw_row)`` pairs from a CSV or NDJSON file."""
+    rows: list[tuple[int, dict]] = []
+    with open(path, newline="", encoding="utf-8") as handle:
+        if Path(path).suffix.lower() in {".ndjson", ".jsonl"}:
+            for line_number, line in enumerate(handle, start=1):
+                if line.strip():
+                    try:
+                        parsed = json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        rows.append((line_number, {"__error__": f"Invalid JSON: {exc.msg}"}))
+                        continue
+                    if not isinstance(parsed, dict):
+                        parsed = {"__error__": "Expected a JSON object"}
+                    rows.append((line_number, parsed))
+            return rows
+        for line_number, row in enumerate(csv.DictReader(handle), start=2):
+            cleaned = {key: value for key, value in row.items() if value not in (None, "")}
+            if "caregivers" in cleaned:
+                cleaned["caregivers"] = [email.strip() for email in cleaned["caregivers"].split(";") if email.strip()]
+            rows.append((line_number, cleaned))
+    return rows
+
+
+def _existing_users(db: Session, emails: set[str]) -> dict[str, tuple[int, str]]:
+    found: dict[str, tuple[int, str]] = {}
+    email_list = sorted(emails)
+    for start in range(0, len(email_list), BATCH_SIZE):
+        chunk = email_list[start : start + BATCH_SIZE]
+        for user_id, email, role in db.query(User.id, User.email, User.role).filter(User.email.in_(chunk)):
+            found[email] = (user_id, role)
+    return found
+
+
+def validate_rows(db: Session, rows: list[tuple[int, dict]]) -> tuple[list[tuple[int, BulkUserIn]], list[dict]]:
+    """Apply the ``/auth/register`` and ``/caregivers/link`` rules to every row."""
+    errors: list[dict] = []
+    parsed: list[tuple[int, BulkUserIn]] = []
+    for line_number, raw in rows:
+        if not isinstance(raw, dict):
+            errors.append({"line": line_number, "email": None, "error": "Expected a JSON object"})
+            continue
+        if "__error__" in raw:
+            errors.append({"line": line_number, "email": None, "error": raw["__error__"]})
+            continue
+        try:
+            parsed.append((line_number, BulkUserIn.model_validate(raw)))
+        except ValidationError as exc:
+            message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors())
+            email = raw.get("email") if isinstance(raw, dict) else None
+            errors.append({"line": line_number, "email": email, "error": message})
+
+    referenced = {row.email for _, row in parsed} | {email for _, row in parsed for email in row.caregivers}
+    existing = _existing_users(db, referenced)
+    # Only rows that pass their own checks claim an email, so a rejected row
+    # neither blocks a corrected duplicate nor shadows its role.
+    seen: dict[str, int] = {}
+    file_roles: dict[str, str] = {}
+    accepted: list[tuple[int, BulkUserIn]] = []
+    for line_number, row in parsed:
+        error = None
+        if row.email in existing:
+            error = "Email already registered"
+        elif row.email in seen:
+            error = f"Duplicate email, first seen on line {seen[row.email]}"
+        elif row.role not in {"USER", "CAREGIVER"}:
+            error = "Invalid role"
+        elif row.role == "USER" and (row.name is None or row.age is None):
+            error = "Profile required for USER"
+        elif row.role == "USER" and row.phone_number:
+            error = "phone_number is only allowed for CAREGIVER"
+        elif row.role == "CAREGIVER" and row.caregivers:
+            error = "caregivers is only allowed for USER"
+        if error:
+            errors.append({"line": line_number, "email": row.email, "error": error})
+            continue
+        seen[row.email] = line_number
+        file_roles[row.email] = row.role
+        accepted.append((line_number, row))
+
+    valid: list[tuple[int, BulkUserIn]] = []
+    for line_number, row in accepted:
+        missing = next(
+            (
+                email
+                for email in row.caregivers
+                if (existing[email][1] if email in existing else file_roles.get(email)) != "CAREGIVER"
+            ),
+            None,
+        )
+        if missing:
+            errors.append({"line": line_number, "email": row.email, "error": f"Caregiver not found: {missing}"})
+        else:
+            valid.append((line_number, row))
+    return valid, errors
+
+
+def hash_passwords(passwords: list[str], workers: int | None = None) -> list[str]:
+    if len(passwords) < 2 or workers == 1:
+        return [hash_password(password) for password in passwords]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+
+def _insert_accounts(db: Session, batch: list[tuple[int, BulkUserIn, str]]) -> dict[str, int]:
+    inserted = db.execute(
+        insert(User).returning(User.id, User.email, sort_by_parameter_order=True),
+        [{"email": row.email, "password_hash": password_hash, "role": row.role} for _, row, password_hash in batch],
+    ).all()
+    batch_ids = {email: user_id for user_id, email in inserted}
+    profiles = [
+        {
+            "user_id": batch_ids[row.email],
+            "name": row.name,
+            "age": row.age,
+            "risk_level": row.risk_level or "standard",
+        }
+        for _, row, _ in batch
+        if row.role == "USER"
+    ]
+    contacts = [
+        {"caregiver_id": batch_ids[row.email], "phone_number": row.phone_number}
+        for _, row, _ in batch
+        if row.role == "CAREGIVER" and row.phone_number
+    ]
+    if profiles:
+        db.execute(insert(Profile), profiles)
+    if contacts:
+        db.execute(insert(CaregiverContact), contacts)
+    return batch_ids
+
+
+def _insert_links(db: Session, batch: list[tuple[int, BulkUserIn, dict]]) -> int:
+    links = [link for _, _, link in batch]
+    db.execute(insert(CaregiverLink), links)
+    bump(db, LINKED, *(link["user_id"] for link in links), *(link["caregiver_id"] for link in links))
+    bump(db, EVENTS, *(link["caregiver_id"] for link in links))
+    return len(batch)
+
+
+def _insert_in_batches(db: Session, items: list[tuple], insert_batch) -> tuple[list, list[dict]]:
+    """Insert ``(line_number, row, ...)`` items in multi-row batches.
+
+    A batch that fails is rolled back and retried one item at a time, each in
+    its own savepoint, so only the offending rows are reported and the rest of
+    the batch is still committed.
+    """
+    results: list = []
+    errors: list[dict] = []
+    for start in range(0, len(items), BATCH_SIZE):
+        batch = items[start : start + BATCH_SIZE]
+        try:
+            results.append(insert_batch(db, batch))
+            db.commit()
+            continue
+        except SQLAlchemyError:
+            db.rollback()
+        for item in batch:
+            try:
+                with db.begin_nested():
+                    results.append(insert_batch(db, [item]))
+            except SQLAlchemyError as exc:
+                detail = str(getattr(exc, "orig", None) or exc).splitlines()[0]
+                errors.append({"line": item[0], "email": item[1].email, "error": f"Insert failed: {detail}"})
+        db.commit()
+    return results, errors
+
+
+def import_rows(db: Session, rows: list[tuple[int, dict]], workers: int | None = None) -> dict:
+    valid, errors = validate_rows(db, rows)
+    hashes = hash_passwords([row.password for _, row in valid], workers)
+    existing_caregivers = _existing_users(db, {email for _, row in valid for email in row.caregivers})
+    user_ids = {email: user_id for email, (user_id, _) in existing_caregivers.items()}
+
+    accounts = [(line_number, row, password_hash) for (line_number, row), password_hash in zip(valid, hashes)]
+    inserted, insert_errors = _insert_in_batches(db, accounts, _insert_accounts)
+    errors.extend(insert_errors)
+    for batch_ids in inserted:
+        user_ids.update(batch_ids)
+    created = sum(len(batch_ids) for batch_ids in inserted)
+
+    links: list[tuple[int, BulkUserIn, dict]] = []
+    for line_number, row in valid:
+        if row.email not in user_ids:
+            continue
+        for email in dict.fromkeys(row.caregivers):
+            if email in user_ids:
+                links.append((line_number, row, {"user_id": user_ids[row.email], "caregiver_id": user_ids[email]}))
+            else:
+                errors.append({"line": line_number, "email": row.email, "error": f"Caregiver not imported: {email}"})
+    linked_counts, link_errors = _insert_in_batches(db, links, _insert_links)
+    errors.extend(link_errors)
+
+    errors.sort(key=lambda error: error["line"] or 0)
+    return {"rows": len(rows), "created": created, "linked": sum(linked_counts), "errors": errors}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk import users, profiles, caregiver links and contacts")
+    parser.add_argument("path", help="CSV or NDJSON (.ndjson/.jsonl) file")
+    parser.add_argument("--workers", type=int, help="Processes used for password hashing (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        report = import_rows(db, read_rows(args.path), args.workers)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,32 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.db import SessionLocal
-from app.models import Heartbeat, Event, Profile, User, CaregiverLink, DeviceToken, CaregiverContact
+from app.models import Heartbeat, Event, Profile, User, CaregiverLink, DeviceToken, CaregiverContact, ActivityProfile
+from app.services.activity import expected_gap_threshold, local_hour
 from app.services.notifications import notification_service
+from app.services.versions import bump_events
 
 CALL_ATTEMPTS: set[int] = set()
-
-
-def _inactivity_threshold(profile: Profile | None, now: datetime) -> timedelta:
-    if profile and profile.risk_level == "high":
+INACTIVITY_CHECK_MINUTES = 15
+CALL_FALLBACK_CHECK_MINUTES = 5
+
+
+def _inactivity_threshold(
+    profile: Profile | None,
+    now: datetime,
+    activity: ActivityProfile | None = None,
+    last_heartbeat: datetime | None = None,
+) -> timedelta:
+    high_risk = profile is not None and profile.risk_level == "high"
+    adaptive = expected_gap_threshold(activity, last_heartbeat)
+    if adaptive is not None:
+        if high_risk:
+            return min(adaptive, timedelta(hours=settings.inactivity_high_risk_hours))
+        return adaptive
+    if high_risk:
         return timedelta(hours=settings.inactivity_high_risk_hours)
-    in_night = now.hour >= settings.night_start_hour or now.hour < settings.night_end_hour
+    hour = local_hour(now, activity.timezone if activity else None)
+    in_night = hour >= settings.night_start_hour or hour < settings.night_end_hour
     if in_night:
         return timedelta(hours=settings.inactivity_night_hours)
     return timedelta(hours=settings.inactivity_standard_hours)
@@ -38,6 +54,7 @@ def _create_event(db: Session, user_id: int, event_type: str) -> Event | None:
         return None
     event = Event(user_id=user_id, type=event_type, status="OPEN")
     db.add(event)
+    bump_events(db, user_id)
     db.commit()
     db.refresh(event)
     return event
@@ -72,6 +89,7 @@ def check_inactivity() -> None:
     try:
         now = datetime.utcnow()
         users = db.query(User).all()
+        activities = {activity.user_id: activity for activity in db.query(ActivityProfile).all()}
         for user in users:
             if user.role != "USER":
                 continue
@@ -82,7 +100,9 @@ def check_inactivity() -> None:
                 .first()
             )
             profile = db.query(Profile).filter(Profile.user_id == user.id).first()
-            threshold = _inactivity_threshold(profile, now)
+            threshold = _inactivity_threshold(
+                profile, now, activities.get(user.id), last_hb.timestamp if last_hb else None
+            )
             if not last_hb or now - last_hb.timestamp > threshold:
                 event = _create_event(db, user.id, "INACTIVITY")
                 if event:
@@ -108,7 +128,7 @@ def check_call_fallbacks() -> None:
 
 def start_scheduler() -> BackgroundScheduler:
     scheduler = BackgroundScheduler()
-    scheduler.add_job(check_inactivity, "interval", minutes=15, id="check_inactivity")
-    scheduler.add_job(check_call_fallbacks, "interval", minutes=5, id="check_call_fallbacks")
+    scheduler.add_job(check_inactivity, "interval", minutes=INACTIVITY_CHECK_MINUTES, id="check_inactivity")
+    scheduler.add_job(check_call_fallbacks, "interval", minutes=CALL_FALLBACK_CHECK_MINUTES, id="check_call_fallbacks")
     scheduler.start()
     return scheduler
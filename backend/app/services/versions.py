@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from sqlalchemy.orm import Session
+
+from app.db import upsert_insert
+from app.models import CaregiverLink, User, UserVersion
+
+EVENTS = "events"
+SAFE_ZONES = "safe_zones"
+LINKED = "linked"
+CONTACT = "contact"
+
+
+def bump(db: Session, scope: str, *user_ids: int) -> None:
+    """Bump the version of ``scope`` for each user, inside the caller's transaction.
+
+    Every write that changes what a user sees on a polled endpoint bumps that
+    user's counter for the endpoint's scope, so an ETag built from the counter
+    changes exactly when the response may have changed. Counters live in the
+    database, so writers outside the API (scheduler, bulk import) are seen too.
+    """
+    ids = sorted(set(user_ids))
+    if not ids:
+        return
+    statement = upsert_insert(db, UserVersion).values(
+        [{"user_id": user_id, "scope": scope, "version": 1} for user_id in ids]
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserVersion.user_id, UserVersion.scope],
+            set_={"version": UserVersion.version + 1},
+        )
+    )
+
+
+def bump_events(db: Session, user_id: int) -> None:
+    """Bump the events scope of a user and of every caregiver who sees their events."""
+    caregiver_ids = [
+        link.caregiver_id for link in db.query(CaregiverLink).filter(CaregiverLink.user_id == user_id).all()
+    ]
+    bump(db, EVENTS, user_id, *caregiver_ids)
+
+
+def current_etag(db: Session, scope: str, user_id: int, role: str | None = None) -> str | None:
+    """ETag of the user's ``scope``, or None if the user is missing or lacks ``role``."""
+    row = (
+        db.query(User.role, UserVersion.version)
+        .outerjoin(UserVersion, (UserVersion.user_id == User.id) & (UserVersion.scope == scope))
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None or (role is not None and row.role != role):
+        return None
+    return f'"{scope}-{user_id}-{row.version or 0}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
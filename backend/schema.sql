@@ -25,6 +25,22 @@ CREATE TABLE heartbeats (
   timestamp TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+CREATE TABLE activity_profiles (
+  user_id INTEGER PRIMARY KEY REFERENCES users(id),
+  timezone TEXT NOT NULL DEFAULT 'UTC',
+  last_heartbeat_at TIMESTAMP,
+  hourly_samples JSON NOT NULL,
+  hourly_gap_mean JSON NOT NULL,
+  hourly_gap_var JSON NOT NULL
+);
+
+CREATE TABLE user_versions (
+  user_id INTEGER NOT NULL REFERENCES users(id),
+  scope TEXT NOT NULL,
+  version INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, scope)
+);
+
 CREATE TABLE safe_zones (
   id SERIAL PRIMARY KEY,
   user_id INTEGER NOT NULL REFERENCES users(id),
@@ -78,7 +78,7 @@ export default function App() {
       await request("/heartbeat", {
         method: "POST",
         headers: apiHeaders,
-        body: JSON.stringify({})
+        body: JSON.stringify({ timezone: Intl.DateTimeFormat().resolvedOptions().timeZone })
       });
       setStatus("ok");
       setLastHeartbeatAt(Date.now());